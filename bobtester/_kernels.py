@@ -0,0 +1,160 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import config, get_num_threads, njit, prange, set_num_threads
+    # Set when numba loads its configuration, so type checkers cannot see it
+    MAX_THREADS = config.NUMBA_NUM_THREADS  # pyright: ignore[reportAttributeAccessIssue]
+except ImportError:  # numba is optional, the kernels then run as plain Python
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+    def get_num_threads() -> int:
+        return 1
+
+    def set_num_threads(n: int) -> None:
+        pass
+
+    prange = range
+    MAX_THREADS = 1
+
+# Outcome codes returned by the kernels
+SKIPPED = 0
+PROFITABLE = 1
+UNPROFITABLE = 2
+LIQUIDATED = 3
+
+
+@njit(cache=True)
+def scan_outcome(
+    lows: np.ndarray,
+    highs: np.ndarray,
+    liquidate_lower: float,
+    liquidate_upper: float,
+    profit_lower: float,
+    profit_upper: float,
+    close_price: float,
+) -> Tuple[int, float]:
+    """
+    Scan a trading period for liquidation and classify its closing price.
+
+    Missing boundaries are passed as -inf/+inf, and both as NaN for a bound without any, so
+    the loop never has to check for None.
+
+    Args:
+        lows (np.ndarray): The daily low prices of the trading period.
+        highs (np.ndarray): The daily high prices of the trading period.
+        liquidate_lower (float): Price below which the position is liquidated.
+        liquidate_upper (float): Price above which the position is liquidated.
+        profit_lower (float): Lower end of the profitable price range.
+        profit_upper (float): Upper end of the profitable price range.
+        close_price (float): The closing price on the last day of the period.
+
+    Returns:
+        Tuple[int, float]: The outcome code and the liquidation price (0 if not liquidated).
+    """
+    for i in range(lows.size):
+        low = lows[i]
+        high = highs[i]
+        if low < liquidate_lower or low > liquidate_upper:
+            return LIQUIDATED, low
+        if high < liquidate_lower or high > liquidate_upper:
+            return LIQUIDATED, high
+
+    if close_price < liquidate_lower or close_price > liquidate_upper:
+        return LIQUIDATED, 0.0
+    if profit_lower <= close_price <= profit_upper:
+        return PROFITABLE, 0.0
+    return UNPROFITABLE, 0.0
+
+
+@njit(cache=True)
+def bound_limits(open_price: float, lower_multiplier: float, upper_multiplier: float) -> Tuple[float, float]:
+    """
+    Compute the limits of a bound for an open price, as Bound computes them for contains.
+
+    NaN multipliers mark missing boundaries. A missing boundary becomes -inf/+inf, and a
+    bound without any boundary gets NaN limits so it contains nothing.
+
+    Args:
+        open_price (float): The opening price of the trade.
+        lower_multiplier (float): Multiplier of the open price giving the lower boundary.
+        upper_multiplier (float): Multiplier of the open price giving the upper boundary.
+
+    Returns:
+        Tuple[float, float]: The lower and upper limits of the bound.
+    """
+    if math.isnan(lower_multiplier) and math.isnan(upper_multiplier):
+        return math.nan, math.nan
+    lower = -math.inf if math.isnan(lower_multiplier) else open_price * lower_multiplier
+    upper = math.inf if math.isnan(upper_multiplier) else open_price * upper_multiplier
+    return lower, upper
+
+
+@njit(cache=True, parallel=True)
+def run_all_trials(
+    opens: np.ndarray,
+    closes: np.ndarray,
+    lows: np.ndarray,
+    highs: np.ndarray,
+    period_days: int,
+    liquidate_lower_multiplier: float,
+    liquidate_upper_multiplier: float,
+    profit_lower_multiplier: float,
+    profit_upper_multiplier: float,
+    active: np.ndarray,
+    outcome_codes: np.ndarray,
+    liquidated_at_prices: np.ndarray,
+) -> None:
+    """
+    Evaluate every backtest trial in a single call, writing into the output arrays.
+
+    Trial i covers the period_days rows ending at row i (fewer at the start of the data)
+    and opens at the open price of its first row. Inactive trials are SKIPPED.
+
+    Args:
+        opens (np.ndarray): The daily open prices.
+        closes (np.ndarray): The daily close prices.
+        lows (np.ndarray): The daily low prices.
+        highs (np.ndarray): The daily high prices.
+        period_days (int): The number of days each trial lasts.
+        liquidate_lower_multiplier (float): Open price multiplier of the lower liquidation boundary, or NaN.
+        liquidate_upper_multiplier (float): Open price multiplier of the upper liquidation boundary, or NaN.
+        profit_lower_multiplier (float): Open price multiplier of the lower profit boundary, or NaN.
+        profit_upper_multiplier (float): Open price multiplier of the upper profit boundary, or NaN.
+        active (np.ndarray): Whether a position is opened for each trial.
+        outcome_codes (np.ndarray): Output array receiving the outcome code of each trial.
+        liquidated_at_prices (np.ndarray): Output array receiving the liquidation price of each trial.
+    """
+    for trial in prange(opens.size):
+        if not active[trial]:
+            outcome_codes[trial] = SKIPPED
+            liquidated_at_prices[trial] = 0.0
+            continue
+
+        start = max(0, trial - period_days + 1)
+        liquidate_lower, liquidate_upper = bound_limits(opens[start], liquidate_lower_multiplier, liquidate_upper_multiplier)
+        profit_lower, profit_upper = bound_limits(opens[start], profit_lower_multiplier, profit_upper_multiplier)
+        outcome_code, liquidated_at_price = scan_outcome(
+            lows[start:trial + 1],
+            highs[start:trial + 1],
+            liquidate_lower,
+            liquidate_upper,
+            profit_lower,
+            profit_upper,
+            closes[trial],
+        )
+        outcome_codes[trial] = outcome_code
+        liquidated_at_prices[trial] = liquidated_at_price
+
+
+try:
+    # The run_all_trials compiled ahead of time by build_aot.py needs no JIT compile on first use,
+    # but pycc cannot build parallel kernels, so it is only used when the trials run on one thread
+    from bobtester._aot import run_all_trials as run_all_trials_serial  # pyright: ignore[reportMissingImports]
+except ImportError:
+    run_all_trials_serial = run_all_trials
@@ -3,16 +3,45 @@ from typing import List, Tuple, Dict, Callable
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
+import numpy as np
 import pandas as pd
 from pandas import DataFrame, Index
 from bobtester.condition import Condition
 from bobtester import Outcomes
+from bobtester import _kernels
 from bobtester.normalize import CryptoDataMerger
-from bobtester.manipulate import get_sub_frames
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
-pd.options.mode.chained_assignment = None  # default='warn'
+__all__ = ['BackTestResult', 'BackTester', 'OUTCOME_DTYPE']
+
+# Maps the outcome codes returned by the kernels back to Outcomes
+_OUTCOMES_BY_CODE = {
+    _kernels.SKIPPED: Outcomes.SKIPPED,
+    _kernels.PROFITABLE: Outcomes.PROFITABLE,
+    _kernels.UNPROFITABLE: Outcomes.UNPROFITABLE,
+    _kernels.LIQUIDATED: Outcomes.LIQUIDATED,
+}
+
+# Categorical dtype of the outcome columns, whose codes are the kernel outcome codes
+OUTCOME_DTYPE = pd.CategoricalDtype([_OUTCOMES_BY_CODE[code].name for code in sorted(_OUTCOMES_BY_CODE)])
+
+
+def _extract_arrays(crypto_data: DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Extract the columns read by the backtest trials as NumPy arrays.
+
+    Args:
+        crypto_data (DataFrame): The merged data of an asset.
+
+    Returns:
+        Dict[str, np.ndarray]: The dates as datetime64[ns] and the open, close, low and high prices as float64.
+    """
+    arrays = {'date': crypto_data['date'].to_numpy(dtype='datetime64[ns]', copy=False)}
+    for column in ('open', 'close', 'low', 'high'):
+        arrays[column] = crypto_data[column].to_numpy(dtype=np.float64, copy=False)
+    return arrays
+
 
 class BackTestResult:
     def __init__(self, name: str, outcomes: pd.DataFrame, crypto_data: pd.DataFrame):
@@ -33,13 +62,32 @@ class BackTestResult:
         """
         Prepare the crypto_data by initializing the outcome column and assigning outcomes based on the dates.
         """
-        # Initialize the outcome column in crypto_data
-        self.crypto_data['outcome'] = 'SKIPPED'
+        dates = self.crypto_data['date'].to_numpy(dtype='datetime64[ns]')
+        order = np.argsort(dates, kind='stable')
+        sorted_dates = dates[order]
+        start_dates = self.outcomes['start_date'].to_numpy(dtype='datetime64[ns]')
+        end_dates = self.outcomes['end_date'].to_numpy(dtype='datetime64[ns]')
+        outcome_codes = pd.Categorical(self.outcomes['outcome'], dtype=OUTCOME_DTYPE).codes
+
+        # Outcome ranges overlap, and later outcomes take precedence over earlier ones
+        sorted_outcome_column = np.full(len(dates), _kernels.SKIPPED, dtype=np.int8)
+        if self.outcomes['start_date'].is_monotonic_increasing and self.outcomes['end_date'].is_monotonic_increasing:
+            # With sorted ranges, the latest outcome starting on or before a date is the
+            # last one covering it, if any does, so every row is assigned at once
+            latest = start_dates.searchsorted(sorted_dates, side='right') - 1
+            covered = latest >= 0
+            covered[covered] = end_dates[latest[covered]] >= sorted_dates[covered]
+            sorted_outcome_column[covered] = outcome_codes[latest[covered]]
+        else:
+            starts = sorted_dates.searchsorted(start_dates, side='left')
+            ends = sorted_dates.searchsorted(end_dates, side='right')
+            for start, end, outcome_code in zip(starts, ends, outcome_codes):
+                sorted_outcome_column[start:end] = outcome_code
 
-        # Assign outcomes to the crypto_data based on the dates in the outcomes DataFrame
-        for index, row in self.outcomes.iterrows():
-            mask = (self.crypto_data['date'] >= row['start_date']) & (self.crypto_data['date'] <= row['end_date'])
-            self.crypto_data.loc[mask, 'outcome'] = row['outcome']
+        outcome_column = np.empty_like(sorted_outcome_column)
+        outcome_column[order] = sorted_outcome_column
+        # Assign to a new frame, as crypto_data may be the BackTester's own asset data
+        self.crypto_data = self.crypto_data.assign(outcome=pd.Categorical.from_codes(outcome_column, dtype=OUTCOME_DTYPE))
 
     def export_outcome(self, merged_crypto_data_path: str | None = None, outcome_data_path: str | None = None) -> None:
         """
@@ -62,16 +110,14 @@ class BackTestResult:
         Returns:
             Dict[str, float]: A dictionary containing the total positions taken and the percentages of each outcome type.
         """
-        # Filter out the rows where outcome is 'SKIPPED'
-        filtered_data = self.outcomes[self.outcomes['outcome'] != 'SKIPPED']
-
-        # Calculate the total positions taken
-        total_positions = filtered_data.shape[0]
+        # Count every outcome type in a single pass
+        counts = self.outcomes['outcome'].value_counts().reindex(OUTCOME_DTYPE.categories, fill_value=0)
+        profitable_count = int(counts['PROFITABLE'])
+        unprofitable_count = int(counts['UNPROFITABLE'])
+        liquidated_count = int(counts['LIQUIDATED'])
 
-        # Calculate the counts for each outcome type
-        profitable_count = filtered_data[filtered_data['outcome'] == 'PROFITABLE'].shape[0]
-        unprofitable_count = filtered_data[filtered_data['outcome'] == 'UNPROFITABLE'].shape[0]
-        liquidated_count = filtered_data[filtered_data['outcome'] == 'LIQUIDATED'].shape[0]
+        # Calculate the total positions taken, leaving out the skipped ones
+        total_positions = int(counts.sum()) - int(counts['SKIPPED'])
 
         percent_profitable = 0
         percent_unprofitable = 0
@@ -130,12 +176,23 @@ class BackTestResult:
         else:
             ax3 = None
 
-        if plot_profitability:
-            # Add background color based on outcomes
+        if plot_profitability and len(self.crypto_data) > 0:
+            # Add background color based on outcomes, with one span per run of equal outcomes
             colors = {'SKIPPED': 'white', 'PROFITABLE': 'green', 'LIQUIDATED': 'indigo', 'UNPROFITABLE': 'yellow'}
+            dates = mdates.date2num(self.crypto_data['date'].to_numpy())
+            outcome_codes = self.crypto_data['outcome'].cat.codes.to_numpy()
+            run_starts = np.r_[0, np.flatnonzero(np.diff(outcome_codes)) + 1]
+            run_ends = np.r_[run_starts[1:], len(outcome_codes)]
+            run_codes = outcome_codes[run_starts]
             for outcome, color in colors.items():
-                ax.fill_between(self.crypto_data['date'], 0, 1, where=(self.crypto_data['outcome']==outcome),
-                                color=color, transform=ax.get_xaxis_transform(), alpha=0.3, label=f'{outcome} Zone')
+                # Skipped days are left blank
+                if outcome == 'SKIPPED':
+                    continue
+                label = f'{outcome} Zone'
+                is_outcome = run_codes == OUTCOME_DTYPE.categories.get_loc(outcome)
+                for start, end in zip(run_starts[is_outcome], run_ends[is_outcome]):
+                    ax.axvspan(float(dates[start]), float(dates[end - 1]), color=color, alpha=0.3, label=label)
+                    label = '_nolegend_'
         # Formatting the plot
         ax.xaxis.set_major_locator(mdates.MonthLocator())
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
@@ -158,91 +215,154 @@ class BackTestResult:
 
 
 class BackTester:
-    def __init__(self, fear_and_greed_path, bitcoin_prices_path, ethereum_prices_path, bitcoin_volatility_path, ethereum_volatility_path):
+    def __init__(self, fear_and_greed_path, bitcoin_prices_path, ethereum_prices_path, bitcoin_volatility_path, ethereum_volatility_path, cache_dir: str | None = None):
         # Forwarding the paths received from BackTester to CryptoDataMerger
         self.merger = CryptoDataMerger(
             fear_and_greed_path=fear_and_greed_path,
             bitcoin_prices_path=bitcoin_prices_path,
             ethereum_prices_path=ethereum_prices_path,
             bitcoin_volatility_path=bitcoin_volatility_path,
-            ethereum_volatility_path=ethereum_volatility_path
+            ethereum_volatility_path=ethereum_volatility_path,
+            cache_dir=cache_dir
         )
         self.btc, self.eth = self.merger.generate_bitcoin_ethereum_dataframes()
 
-    def backtest(self, name : str, strategy_conditions: Condition, asset: str, start_position : Callable[[DataFrame], bool], start_from : datetime.date | None = None) -> BackTestResult:
+    def backtest(
+        self,
+        name : str,
+        strategy_conditions: Condition,
+        asset: str,
+        start_position : Callable[[DataFrame], bool] | None = None,
+        start_from : datetime.date | None = None,
+        n_jobs : int | None = 1,
+        start_signal : np.ndarray | str | Callable[[DataFrame], np.ndarray] | None = None,
+        start_position_array : Callable[[np.ndarray, int, Dict[str, int]], bool] | None = None,
+    ) -> BackTestResult:
         """
         Perform a backtest on the specified asset using the given strategy conditions.
 
+        Positions are opened either by start_position or start_position_array, which are called
+        once per trial, or by start_signal, which gives the decision for every day at once.
+        Exactly one of them must be provided.
+
         Args:
             name (str): The name of the backtest.
             strategy_conditions (Condition): The conditions for the strategy.
             asset (str): The asset to backtest ('btc' or 'eth').
-            start_position (Callable[[DataFrame], bool]): A callback function to determine the start position.
+            start_position (Callable[[DataFrame], bool] | None): A callback function to determine the start position.
+                It receives the asset data up to the day before the trial.
             start_from (datetime.date | None): The start date for the backtest.
+            n_jobs (int | None): The number of threads used to evaluate the trials when numba is
+                installed, or None to use every CPU. Values above the number of CPUs are capped.
+            start_signal (np.ndarray | str | Callable[[DataFrame], np.ndarray] | None): A boolean per row of the
+                backtested asset data, or an expression or function computing it from that data. Expressions
+                such as "(fear_and_greed < 70) & (volatility < 90)" are evaluated over whole columns with
+                DataFrame.eval. A position is opened on the day after each row where the signal is set.
+            start_position_array (Callable[[np.ndarray, int, Dict[str, int]], bool] | None): A callback like
+                start_position that reads plain arrays instead of a DataFrame. It receives the numeric columns of
+                the asset data as a float64 array, the row of the day before the trial and the column positions
+                by name, e.g. values[row, columns['volatility']]. Trials without a previous day are skipped.
 
         Returns:
             BackTestResult: The result of the backtest.
         """
-        columns = ["start_date", "end_date", "outcome", "open_price", "close_price", "liquidated_at_price"]
-        outcome_dataframe = DataFrame(columns=columns)
+        if sum(option is not None for option in (start_position, start_signal, start_position_array)) != 1:
+            raise ValueError("Exactly one of start_position, start_signal and start_position_array must be provided")
+        if n_jobs is not None and n_jobs < 1:
+            raise ValueError(f"n_jobs must be a positive integer or None, got {n_jobs}")
 
         crypto_dataframe = self.btc
         if asset.lower() == "eth":
             crypto_dataframe = self.eth
 
         if start_from:
-            crypto_dataframe = crypto_dataframe[crypto_dataframe['date'] >= pd.to_datetime(start_from)]
-
-        sub_frames = get_sub_frames(crypto_dataframe, strategy_conditions.period_days)
-        for i, edf in enumerate(sub_frames):
-        # for df in sub_frames:
-            # Adjusted to pass trimmed dataframe to the callback
-            if len(edf) > strategy_conditions.period_days:
-                trimmed_edf = edf.iloc[:-strategy_conditions.period_days]
+            crypto_dataframe = crypto_dataframe.loc[crypto_dataframe['date'] >= pd.Timestamp(start_from)]
+
+        # Extracted from the frame being backtested, so the prices always match the data
+        # seen by the callbacks, even after self.btc or self.eth are replaced
+        arrays = _extract_arrays(crypto_dataframe)
+        dates = arrays['date']
+        opens = arrays['open']
+        closes = arrays['close']
+        lows = arrays['low']
+        highs = arrays['high']
+
+        # Trial i covers rows [trial_starts[i], i] of the asset data
+        trial_starts = np.maximum(np.arange(len(dates)) - strategy_conditions.period_days + 1, 0)
+
+        # Decide which trials open a position before evaluating any of them, so all the
+        # trials can be evaluated in a single kernel call
+        if start_signal is not None:
+            if isinstance(start_signal, str):
+                # Evaluated over whole columns at once, by numexpr when it is installed
+                signal = crypto_dataframe.eval(start_signal)
+            elif callable(start_signal):
+                signal = start_signal(crypto_dataframe)
             else:
-                trimmed_edf = pd.DataFrame()  # Empty dataframe if not enough rows
-
-            df = edf.iloc[max(0, i - strategy_conditions.period_days + 1):i + 1].copy()
-            start_date = df.iloc[0]['date']
-            end_date = df.iloc[-1]['date']
-            open_price = df.iloc[0]['open']
-            close_price = df.iloc[-1]['close']
-            outcome, liquidated_at_price = Outcomes.SKIPPED, 0
-            if start_position(trimmed_edf):
-                strategy_conditions.update_open_price(new_open_price=open_price)
-                outcome, liquidated_at_price = self._get_outcome(df, strategy_conditions)
-
-            new_row = {
-                "start_date": start_date,
-                "end_date": end_date,
-                "outcome": outcome.name,
-                "open_price": open_price,
-                "close_price": close_price,
-                "liquidated_at_price": liquidated_at_price
-            }
-            new_row_df = pd.DataFrame([new_row])
-            new_row_df = new_row_df.dropna(axis=1, how='all')
-            outcome_dataframe = pd.concat([outcome_dataframe, new_row_df], ignore_index=True)
+                signal = start_signal
+            signal = np.asarray(signal, dtype=np.bool_)
+            if signal.shape != (len(crypto_dataframe),):
+                raise ValueError(f"start_signal has shape {signal.shape}, expected ({len(crypto_dataframe)},)")
+            # A trial follows the signal of the day before its first day
+            active = (trial_starts > 0) & signal[trial_starts - 1]
+        elif start_position_array is not None:
+            # Flattened once, so the callback does plain array lookups instead of DataFrame indexing
+            numeric = crypto_dataframe.select_dtypes(include='number')
+            values = numeric.to_numpy(dtype=np.float64)
+            columns = {column: i for i, column in enumerate(numeric.columns)}
+            active = np.fromiter(
+                (trial_start > 0 and bool(start_position_array(values, trial_start - 1, columns)) for trial_start in trial_starts),
+                dtype=np.bool_,
+                count=len(trial_starts),
+            )
+        else:
+            # Checked above: with the other options unset, start_position is the one provided
+            assert start_position is not None
+            start_position_callback = start_position
+            # The callback sees the rows before the trial, as a view rather than a copied sub-frame
+            active = np.fromiter(
+                (bool(start_position_callback(crypto_dataframe.iloc[:trial_start])) for trial_start in trial_starts),
+                dtype=np.bool_,
+                count=len(trial_starts),
+            )
+
+        outcome_codes = np.empty(len(dates), dtype=np.int8)
+        liquidated_at_prices = np.empty(len(dates))
+        # Missing boundaries are passed to the kernel as NaN multipliers
+        liquidate_lower, liquidate_upper, profit_lower, profit_upper = (
+            np.nan if multiplier is None else multiplier for multiplier in strategy_conditions.bound_multipliers
+        )
+        threads = min(n_jobs or _kernels.MAX_THREADS, _kernels.MAX_THREADS)
+        # A single thread gains nothing from the parallel kernel, so it runs the serial one,
+        # which is precompiled when build_aot.py has been run
+        run_all_trials = _kernels.run_all_trials_serial if threads == 1 else _kernels.run_all_trials
+        num_threads = _kernels.get_num_threads()
+        _kernels.set_num_threads(threads)
+        try:
+            run_all_trials(
+                opens,
+                closes,
+                lows,
+                highs,
+                strategy_conditions.period_days,
+                liquidate_lower,
+                liquidate_upper,
+                profit_lower,
+                profit_upper,
+                active,
+                outcome_codes,
+                liquidated_at_prices,
+            )
+        finally:
+            _kernels.set_num_threads(num_threads)
+
+        outcome_dataframe = DataFrame({
+            "start_date": dates[trial_starts],
+            "end_date": dates,
+            "outcome": pd.Categorical.from_codes(outcome_codes, dtype=OUTCOME_DTYPE),
+            "open_price": opens[trial_starts],
+            "close_price": closes,
+            "liquidated_at_price": liquidated_at_prices
+        })
 
         return BackTestResult(name, outcome_dataframe, crypto_dataframe)
-
-
-    def _get_outcome(self, period: DataFrame, condition: Condition) -> Tuple[Outcomes, float]:
-        """
-        Determine the outcome of a trading period based on the given condition.
-
-        Args:
-            period (DataFrame): The DataFrame representing the trading period.
-            condition (Condition): The condition to evaluate.
-
-        Returns:
-            Tuple[Outcomes, float]: The outcome of the period and the liquidation price (if applicable).
-        """
-        for index, row in period.iterrows():
-            low_liquidated = condition.return_current_status(float(row['low'])) == Outcomes.LIQUIDATED
-            high_liquidated = condition.return_current_status(float(row['high'])) == Outcomes.LIQUIDATED
-
-            if low_liquidated or high_liquidated:
-                return Outcomes.LIQUIDATED, (float(row['low']) if low_liquidated else float(row['high']))
-
-        return condition.return_current_status(period.iloc[-1]['close']), 0
@@ -1,3 +1,6 @@
+import math
+from typing import Tuple
+
 from bobtester import StrategyTypes, Outcomes
 
 class Bound:
@@ -19,9 +22,39 @@ class Bound:
             upper (float | None): The upper boundary of the range.
             inside (bool): Specifies if the boundaries are inclusive (True) or exclusive (False).
         """
-        self.lower = lower
-        self.upper = upper
+        self._lower = lower
+        self._upper = upper
         self.inside = inside
+        self._update_limits()
+
+    @property
+    def lower(self) -> float | None:
+        """The lower boundary of the range."""
+        return self._lower
+
+    @lower.setter
+    def lower(self, lower: float | None) -> None:
+        self._lower = lower
+        self._update_limits()
+
+    @property
+    def upper(self) -> float | None:
+        """The upper boundary of the range."""
+        return self._upper
+
+    @upper.setter
+    def upper(self, upper: float | None) -> None:
+        self._upper = upper
+        self._update_limits()
+
+    def _update_limits(self) -> None:
+        """Precomputes the float limits used by contains."""
+        if self._lower is None and self._upper is None:
+            # A bound without boundaries contains nothing, and NaN fails every comparison
+            self._lower_limit = self._upper_limit = math.nan
+        else:
+            self._lower_limit = self._lower if self._lower is not None else -math.inf
+            self._upper_limit = self._upper if self._upper is not None else math.inf
 
     def contains(self, value: float) -> bool:
         """
@@ -34,20 +67,8 @@ class Bound:
             bool: True if the value is within the bound, False otherwise.
         """
         if self.inside:
-            if self.lower is not None and self.upper is not None:
-                return self.lower <= value <= self.upper
-            elif self.lower is not None:
-                return self.lower <= value
-            elif self.upper is not None:
-                return value <= self.upper
-        else:
-            if self.lower is not None and self.upper is not None:
-                return value < self.lower or value > self.upper
-            elif self.lower is not None:
-                return value < self.lower
-            elif self.upper is not None:
-                return value > self.upper
-        return False
+            return self._lower_limit <= value <= self._upper_limit
+        return value < self._lower_limit or value > self._upper_limit
 
     def __str__(self) -> str:
         """
@@ -104,17 +125,40 @@ class Condition:
 
     def initialize_bounds(self):
         """Initializes the profit and liquidation bounds based on the provided price factors."""
-        self.profit_bound = Bound(
-            lower=self.open_price * (1 - self.profit_below_price_factor) if self.profit_below_price_factor is not None else None,
-            upper=self.open_price * (1 + self.profit_above_price_factor) if self.profit_above_price_factor is not None else None,
-        )
+        self.profit_bound = Bound()
+        self.liquidate_bound = Bound(inside=False)
+        self._move_bounds()
+
+    def _multipliers(self) -> Tuple[float | None, float | None, float | None, float | None]:
+        """
+        Computes the open price multipliers of the bounds from the current price factors.
+
+        The factors are read on every call, so changing them between backtests takes effect.
 
-        self.liquidate_bound = Bound(
-            lower=self.open_price * (1 - self.liquidate_below_price_factor) if self.liquidate_below_price_factor is not None else None,
-            upper=self.open_price * (1 + self.liquidate_above_price_factor) if self.liquidate_above_price_factor is not None else None,
-            inside=False
+        Returns:
+            Tuple[float | None, float | None, float | None, float | None]: The multipliers of the lower/upper
+                liquidation and lower/upper profit boundaries, None for a missing boundary.
+        """
+        return (
+            1 - self.liquidate_below_price_factor if self.liquidate_below_price_factor is not None else None,
+            1 + self.liquidate_above_price_factor if self.liquidate_above_price_factor is not None else None,
+            1 - self.profit_below_price_factor if self.profit_below_price_factor is not None else None,
+            1 + self.profit_above_price_factor if self.profit_above_price_factor is not None else None,
         )
 
+    def _move_bounds(self) -> None:
+        """Sets the boundaries of the existing bounds from the open price and the current price factors."""
+        liquidate_lower, liquidate_upper, profit_lower, profit_upper = self._multipliers()
+        self.profit_bound.lower = self.open_price * profit_lower if profit_lower is not None else None
+        self.profit_bound.upper = self.open_price * profit_upper if profit_upper is not None else None
+        self.liquidate_bound.lower = self.open_price * liquidate_lower if liquidate_lower is not None else None
+        self.liquidate_bound.upper = self.open_price * liquidate_upper if liquidate_upper is not None else None
+
+    @property
+    def bound_multipliers(self) -> Tuple[float | None, float | None, float | None, float | None]:
+        """The open price multipliers of the lower/upper liquidation and lower/upper profit boundaries."""
+        return self._multipliers()
+
     def determine_strategy(self):
         """Determines the trading strategy based on the set profit bounds."""
         if self.profit_bound.upper and self.profit_bound.lower:
@@ -125,15 +169,11 @@ class Condition:
             self.strategy = StrategyTypes.BEAR_CALL_SPREAD
 
     def update_open_price(self, new_open_price: float) -> None:
-        """Updates the open price and reinitializes conditions based on the new price."""
-        self.__init__(
-            new_open_price,
-            self.period_days,
-            self.profit_below_price_factor,
-            self.profit_above_price_factor,
-            self.liquidate_below_price_factor,
-            self.liquidate_above_price_factor,
-        )
+        """Updates the open price and moves the existing bounds to match the new price and price factors."""
+        self.open_price = new_open_price
+        self._move_bounds()
+        # The strategy is derived from the bound values, which are all zero for a zero open price
+        self.determine_strategy()
 
     def __str__(self) -> str:
         """
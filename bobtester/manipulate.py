@@ -13,11 +13,9 @@ def get_sub_frames(df: pd.DataFrame, period_days: int, start_from : datetime.dat
 
         Returns:
     List[pd.DataFrame]: A list of sub-DataFrames, each containing data up to the current day in the loop.
+    The sub-DataFrames are slices of df rather than copies, so they should be treated as read-only.
     """
-    sub_frames = []
-
-    for i in range(len(df)):
-        # sub_frame = df.iloc[max(0, i - period_days + 1):i + 1].copy()
-        sub_frame = df.iloc[:i + 1].copy()
-        sub_frames.append(sub_frame)
+    # Built at its final size rather than grown by appending. Slicing without .copy()
+    # keeps memory at O(N) rather than O(N^2) copied rows
+    sub_frames = [df.iloc[:i + 1] for i in range(len(df))]
     return sub_frames
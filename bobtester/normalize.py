@@ -1,5 +1,98 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import List, Tuple, cast
+
+# Bumped whenever the merge pipeline changes, so older cached results are not reused
+_CACHE_VERSION = 3
+
+# Translation table replacing spaces with underscores and dropping ® signs and quotes
+_COLUMN_NAME_TABLE = str.maketrans({' ': '_', '®': None, '"': None})
+
+
+def _standardize_column_name(name: str) -> str:
+    """Lowercases a column name, replaces spaces with underscores and drops ® signs and quotes."""
+    return name.strip().lower().translate(_COLUMN_NAME_TABLE)
+
+
+def _read_csv(path: str) -> pd.DataFrame:
+    """
+    Reads an input CSV file, parsing its date column and thousands-separated numbers while loading.
+
+    The header is peeked at and standardized first, so the DataFrame is built with its final column names.
+
+    Args:
+        path (str): Path to the CSV file.
+
+    Returns:
+        pd.DataFrame: The loaded data, with standardized column names.
+    """
+    # Peeking at the header reads the input twice, which file objects do not allow, so their
+    # columns are renamed and their dates left to the parsing fallback after loading
+    if not isinstance(path, (str, os.PathLike)):
+        return pd.read_csv(path, engine='c', thousands=',').rename(columns=_standardize_column_name)
+
+    # Read through pandas, so compressed files and URLs are handled like in the main read
+    names = [_standardize_column_name(col) for col in pd.read_csv(path, nrows=0).columns]
+    # Thousands separators and dates are parsed by the C reader while loading
+    return pd.read_csv(
+        path,
+        engine='c',
+        thousands=',',
+        header=0,
+        names=names,
+        parse_dates=[col for col in names if col == 'date'],
+    )
+
+
+def _index_by_date(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sets the date column as a sorted index, which the merge requires to be unique.
+
+    Input files are usually already in date order, in which case the sort is skipped.
+
+    Args:
+        df (pd.DataFrame): Data with a 'date' column.
+
+    Returns:
+        pd.DataFrame: The data indexed by date.
+
+    Raises:
+        ValueError: If a date appears more than once.
+    """
+    df = df.set_index('date')
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind='stable')
+    if not df.index.is_unique:
+        raise ValueError(f"Duplicate dates in input data: {df.index[df.index.duplicated()].unique().tolist()}")
+    return df
+
+
+def _interpolate_linear(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Linearly interpolates missing values in the float columns, in place.
+
+    Matches DataFrame.interpolate(method='linear'): values are spaced by position, leading
+    missing values are kept and trailing ones take the last valid value.
+
+    Args:
+        df (pd.DataFrame): The data to interpolate.
+
+    Returns:
+        pd.DataFrame: The same DataFrame, with missing values filled.
+    """
+    positions = np.arange(len(df), dtype=np.float64)
+    for col in df.select_dtypes(include='float').columns:
+        values = df[col].to_numpy(dtype=np.float64, copy=True)
+        valid = ~np.isnan(values)
+        if valid.any() and not valid.all():
+            missing = ~valid & (positions > np.argmax(valid))
+            values[missing] = np.interp(positions[missing], positions[valid], values[valid])
+            df[col] = values
+    return df
+
 
 class CryptoDataMerger:
     """
@@ -11,6 +104,8 @@ class CryptoDataMerger:
         ethereum_prices_path (str): Path to the Ethereum prices CSV file.
         bitcoin_volatility_path (str): Path to the Bitcoin volatility CSV file.
         ethereum_volatility_path (str): Path to the Ethereum volatility CSV file.
+        cache_dir (str | None): Directory where merged DataFrames are cached, or None to disable caching.
+            Inputs given as file objects are never cached.
     """
 
     def __init__(self,
@@ -19,12 +114,40 @@ class CryptoDataMerger:
         ethereum_prices_path,
         bitcoin_volatility_path,
         ethereum_volatility_path,
+        cache_dir: str | None = None,
     ):
         self.fear_and_greed_path = fear_and_greed_path
         self.bitcoin_prices_path = bitcoin_prices_path
         self.ethereum_prices_path = ethereum_prices_path
         self.bitcoin_volatility_path = bitcoin_volatility_path
         self.ethereum_volatility_path = ethereum_volatility_path
+        self.cache_dir = cache_dir
+
+    def _paths(self) -> List[str]:
+        """Returns the paths of the input CSV files."""
+        return [
+            self.fear_and_greed_path,
+            self.bitcoin_prices_path,
+            self.ethereum_prices_path,
+            self.bitcoin_volatility_path,
+            self.ethereum_volatility_path,
+        ]
+
+    def _cache_path(self) -> str | None:
+        """
+        Returns the cache file for the current input files, keyed by their paths, sizes and modification times.
+
+        Returns:
+            str | None: Path of the cache file, or None if caching is disabled or an input is not a file path.
+        """
+        if self.cache_dir is None:
+            return None
+        # File objects have no path to stat, so their contents cannot be checked against a cache
+        if not all(isinstance(path, (str, os.PathLike)) for path in self._paths()):
+            return None
+        stats = [(os.path.abspath(path), os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in self._paths()]
+        key = hashlib.sha1(repr((_CACHE_VERSION, stats)).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key}.pkl")
 
     def generate_bitcoin_ethereum_dataframes(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
@@ -32,42 +155,56 @@ class CryptoDataMerger:
 
         This method loads data from CSV files, standardizes date columns, converts
         relevant columns to numeric types, merges the data into two DataFrames (one for Bitcoin
-        and one for Ethereum), and interpolates missing data.
+        and one for Ethereum), and interpolates missing data. When a cache directory is set,
+        the result is stored there and reused for as long as the input files are unchanged.
 
         Returns:
             Tuple[pd.DataFrame, pd.DataFrame]: A tuple containing two DataFrames:
                 - Bitcoin merged DataFrame
                 - Ethereum merged DataFrame
         """
-        # Load data
-        fear_and_greed_df = pd.read_csv(self.fear_and_greed_path)
-        bitcoin_prices_df = pd.read_csv(self.bitcoin_prices_path)
-        ethereum_prices_df = pd.read_csv(self.ethereum_prices_path)
-        bitcoin_volatility_df = pd.read_csv(self.bitcoin_volatility_path)
-        ethereum_volatility_df = pd.read_csv(self.ethereum_volatility_path)
-
-        # Standardize date columns
+        cache_path = self._cache_path()
+        if cache_path is not None and os.path.exists(cache_path):
+            return cast(Tuple[pd.DataFrame, pd.DataFrame], pd.read_pickle(cache_path))
+
+        # Load data concurrently, the C reader releases the GIL while parsing
+        paths = self._paths()
+        with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+            fear_and_greed_df, bitcoin_prices_df, ethereum_prices_df, bitcoin_volatility_df, ethereum_volatility_df = executor.map(_read_csv, paths)
+
+        # Standardize date columns, parsing only the dates read_csv could not parse itself
         dfs = [fear_and_greed_df, bitcoin_prices_df, ethereum_prices_df, bitcoin_volatility_df, ethereum_volatility_df]
         for df in dfs:
-            df.columns = [col.strip().lower().replace(" ", "_").replace("®", "").replace('"', '') for col in df.columns]
-            df['date'] = pd.to_datetime(df['date'])
+            if not pd.api.types.is_datetime64_any_dtype(df['date']):
+                df['date'] = pd.to_datetime(df['date'], cache=True)
 
         # Convert columns to numeric, handling special formats
         def convert_to_numeric(df):
-            for col in df.columns:
-                if df[col].dtype == 'object' and col != 'date':
-                    df[col] = df[col].str.replace(',', '').replace('%', '', regex=True).astype(float) / 100
+            for col in df.select_dtypes(include='object').columns.difference(['date']):
+                values = df[col].str.replace(',', '', regex=False)
+                # Only percentage columns are scaled down to fractions
+                if values.str.endswith('%').any():
+                    df[col] = cast(pd.Series, pd.to_numeric(values.str.rstrip('%'), errors='coerce')) / 100
+                else:
+                    df[col] = pd.to_numeric(values, errors='coerce')
             return df
 
         dfs = list(map(convert_to_numeric, dfs))
+
+        # Index every frame by date once, so each asset is merged in a single aligned join
+        dfs = list(map(_index_by_date, dfs))
         fear_and_greed_df, bitcoin_prices_df, ethereum_prices_df, bitcoin_volatility_df, ethereum_volatility_df = dfs
-        bitcoin_merged_df = pd.merge(fear_and_greed_df, bitcoin_prices_df, on='date', how='inner')
-        bitcoin_merged_df = pd.merge(bitcoin_merged_df, bitcoin_volatility_df, on='date', how='inner')
-        ethereum_merged_df = pd.merge(fear_and_greed_df, ethereum_prices_df, on='date', how='inner')
-        ethereum_merged_df = pd.merge(ethereum_merged_df, ethereum_volatility_df, on='date', how='inner')
+        bitcoin_merged_df = pd.concat([fear_and_greed_df, bitcoin_prices_df, bitcoin_volatility_df], axis=1, join='inner').reset_index()
+        ethereum_merged_df = pd.concat([fear_and_greed_df, ethereum_prices_df, ethereum_volatility_df], axis=1, join='inner').reset_index()
 
         # Clean and interpolate missing data
-        bitcoin_merged_df = bitcoin_merged_df.interpolate(method='linear')
-        ethereum_merged_df = ethereum_merged_df.interpolate(method='linear')
+        bitcoin_merged_df = _interpolate_linear(bitcoin_merged_df)
+        ethereum_merged_df = _interpolate_linear(ethereum_merged_df)
+
+        if cache_path is not None:
+            # Write to a temporary file first, so concurrent runs never read a partial cache
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            pd.to_pickle((bitcoin_merged_df, ethereum_merged_df), f"{cache_path}.{os.getpid()}.tmp")
+            os.replace(f"{cache_path}.{os.getpid()}.tmp", cache_path)
 
         return bitcoin_merged_df, ethereum_merged_df
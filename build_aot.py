@@ -0,0 +1,26 @@
+"""
+Ahead-of-time compiles the numba kernels of bobtester/_kernels.py into the bobtester._aot
+extension module. Backtests running on a single thread use it instead of JIT compiling the kernel.
+
+Requires numba at build time only. Run from the repository root before building a wheel:
+
+    python build_aot.py
+"""
+import os
+
+from numba.pycc.cc import CC
+
+from bobtester import _kernels
+
+cc = CC('_aot')
+cc.output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bobtester')
+# pycc does not support parallel=True, so the compiled run_all_trials loops over the trials serially.
+# It calls scan_outcome internally, which is compiled into it. py_func is the plain Python function
+# behind a numba dispatcher, which type checkers see as a plain function
+cc.export(
+    'run_all_trials',
+    'void(f8[:], f8[:], f8[:], f8[:], i8, f8, f8, f8, f8, b1[:], i1[:], f8[:])',
+)(_kernels.run_all_trials.py_func)  # pyright: ignore[reportFunctionMemberAccess]
+
+if __name__ == '__main__':
+    cc.compile()